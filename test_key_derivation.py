@@ -4,39 +4,22 @@ Test key derivation to understand how to get from the card's public key
 to the registered address 0xe104892a4bcfb40cc2555c69e2a09050becf7ed8
 """
 
-from eth_utils import keccak
-from eth_keys import keys
+import io
+import sys
+from contextlib import redirect_stdout
+from typing import Final
 
-def derive_address_from_public_key(public_key_hex, compressed=True):
-    """Derive Ethereum address from public key."""
-    try:
-        if public_key_hex.startswith('0x'):
-            public_key_hex = public_key_hex[2:]
-        
-        if compressed and len(public_key_hex) == 66:  # 33 bytes compressed
-            # Decompress the public key
-            public_key_bytes = bytes.fromhex(public_key_hex)
-            public_key_obj = keys.PublicKey.from_compressed_bytes(public_key_bytes)
-            uncompressed_bytes = public_key_obj.to_bytes()
-        elif len(public_key_hex) == 130:  # 65 bytes uncompressed
-            uncompressed_bytes = bytes.fromhex(public_key_hex)
-        else:
-            return f"Invalid public key length: {len(public_key_hex)}"
-        
-        # Remove the 0x04 prefix for uncompressed keys
-        if uncompressed_bytes[0] == 0x04:
-            uncompressed_bytes = uncompressed_bytes[1:]
-        
-        # Keccak256 hash of the uncompressed public key (64 bytes)
-        hash_result = keccak(uncompressed_bytes)
-        
-        # Take the last 20 bytes as the address
-        address = hash_result[-20:]
-        
-        return f"0x{address.hex()}"
-        
-    except Exception as e:
-        return f"Error: {e}"
+from tangem_crypto import derive_address_from_public_key, format_address
+
+# Data from our logs
+REGISTERED_ADDRESS: Final = bytes.fromhex("e104892a4bcfb40cc2555c69e2a09050becf7ed8")
+ACTUAL_SIGNING_ADDRESS: Final = bytes.fromhex("9fe13b041b6811b717b311fce887146972b20d6a")
+
+# Wallet public keys from card
+WALLET_KEYS: Final = (
+    ("Wallet[0] (secp256k1)", bytes.fromhex("032c6f575345bafa41227d802afaa251f9fd1d5613a0f729b46a200ac90a92f6df")),
+    ("Wallet[3] (Bip0340)", bytes.fromhex("2c6f575345bafa41227d802afaa251f9fd1d5613a0f729b46a200ac90a92f6df")),  # Same but uncompressed?
+)
 
 def main():
     """Analyze key derivation for Tangem card."""
@@ -44,15 +27,8 @@ def main():
     print("TANGEM KEY DERIVATION ANALYSIS")
     print("=" * 50)
     
-    # Data from our logs
-    registered_address = "0xe104892a4bcfb40cc2555c69e2a09050becf7ed8"
-    actual_signing_address = "0x9fe13b041b6811b717b311fce887146972b20d6a"
-    
-    # Wallet public keys from card
-    wallet_keys = {
-        "Wallet[0] (secp256k1)": "032c6f575345bafa41227d802afaa251f9fd1d5613a0f729b46a200ac90a92f6df",
-        "Wallet[3] (Bip0340)": "2c6f575345bafa41227d802afaa251f9fd1d5613a0f729b46a200ac90a92f6df",  # Same but uncompressed?
-    }
+    registered_address = format_address(REGISTERED_ADDRESS)
+    actual_signing_address = format_address(ACTUAL_SIGNING_ADDRESS)
     
     print(f"Registered address: {registered_address}")
     print(f"Actual signing address: {actual_signing_address}")
@@ -61,18 +37,24 @@ def main():
     print("Testing address derivation from wallet public keys:")
     print()
     
-    for wallet_name, public_key in wallet_keys.items():
+    for wallet_name, public_key in WALLET_KEYS:
         print(f"{wallet_name}:")
-        print(f"  Public Key: {public_key}")
+        print(f"  Public Key: {public_key.hex()}")
         
         # Test both compressed and uncompressed derivation
-        compressed_addr = derive_address_from_public_key(public_key, compressed=True)
-        print(f"  Compressed derivation: {compressed_addr}")
+        try:
+            compressed_addr = derive_address_from_public_key(public_key)
+        except ValueError as e:
+            print(f"  Compressed derivation: {e}")
+            print(f"  ❌ No match")
+            print()
+            continue
+        print(f"  Compressed derivation: {format_address(compressed_addr)}")
         
         # Check if this matches any of our addresses
-        if compressed_addr.lower() == registered_address.lower():
+        if compressed_addr == REGISTERED_ADDRESS:
             print(f"  ✅ MATCHES REGISTERED ADDRESS!")
-        elif compressed_addr.lower() == actual_signing_address.lower():
+        elif compressed_addr == ACTUAL_SIGNING_ADDRESS:
             print(f"  ✅ MATCHES ACTUAL SIGNING ADDRESS!")
         else:
             print(f"  ❌ No match")
@@ -108,4 +90,10 @@ def main():
         print("❌ Suffixes different - completely different keys")
 
 if __name__ == "__main__":
-    main()
+    # Collect the report in memory and emit it with a single write
+    out = io.StringIO()
+    try:
+        with redirect_stdout(out):
+            main()
+    finally:
+        sys.stdout.write(out.getvalue())
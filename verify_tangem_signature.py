@@ -8,8 +8,31 @@ to determine what hash our Tangem card is actually signing.
 """
 
 import hashlib
-from eth_utils import keccak
-from eth_keys import keys
+import io
+import sys
+from contextlib import redirect_stdout
+from functools import cache
+
+from tangem_crypto import keccak, recover_address
+
+PERSONAL_SIGN_PREFIX = b"\x19Ethereum Signed Message:\n32"
+
+@cache
+def build_hash_candidates(safe_tx_hash_bytes):
+    """
+    Hash candidates based on expert's analysis, as a tuple of (name, hash_bytes) pairs.
+    Cached so both the Phase 1 and Phase 2 checks reuse the same digests.
+    """
+    sha256 = hashlib.sha256
+    sha256_hash = sha256(safe_tx_hash_bytes).digest()
+    return (
+        ("Raw safeTxHash", safe_tx_hash_bytes),
+        ("SHA256(safeTxHash)", sha256_hash),
+        ("SHA256(SHA256(safeTxHash))", sha256(sha256_hash).digest()),
+        ("Keccak256(safeTxHash)", keccak(safe_tx_hash_bytes)),
+        # Ethereum personal sign format
+        ("Personal Sign Format", keccak(PERSONAL_SIGN_PREFIX + safe_tx_hash_bytes)),
+    )
 
 def verify_signature_recovery(signature_hex, hash_candidates, expected_address):
     """
@@ -28,19 +51,25 @@ def verify_signature_recovery(signature_hex, hash_candidates, expected_address):
         print(f"❌ Invalid signature length: {len(signature_hex)} (expected 130)")
         return
     
-    r_hex = signature_hex[:64]
-    s_hex = signature_hex[64:128]
-    v_hex = signature_hex[128:130]
+    # Decode once; r, s and v are byte slices from here on
+    sig_bytes = bytes.fromhex(signature_hex)
+    rs_bytes = sig_bytes[:64]
     
     print(f"Signature Analysis:")
-    print(f"  r: {r_hex}")
-    print(f"  s: {s_hex}")
-    print(f"  v: {v_hex}")
+    print(f"  r: {sig_bytes[:32].hex()}")
+    print(f"  s: {sig_bytes[32:64].hex()}")
+    print(f"  v: {sig_bytes[64]:02x}")
     print(f"  Expected signer: {expected_address}")
     print()
     
+    # The signature only depends on v, so build the r||s||recovery_id form per v value
+    # up front (recovery expects recovery_id 0/1, not v 27/28)
+    signatures = {v_int: rs_bytes + bytes([v_int - 27]) for v_int in (27, 28)}
+    
+    expected_lower = expected_address.lower()
+    
     # Test recovery against each hash candidate
-    for i, (name, hash_bytes) in enumerate(hash_candidates.items(), 1):
+    for i, (name, hash_bytes) in enumerate(hash_candidates, 1):
         print(f"Test {i} - {name}:")
         print(f"  Hash: {hash_bytes.hex()}")
         
@@ -48,23 +77,11 @@ def verify_signature_recovery(signature_hex, hash_candidates, expected_address):
             # Test both v values (27 and 28)
             for v_int in [27, 28]:
                 try:
-                    # Create signature object
-                    r = int(r_hex, 16)
-                    s = int(s_hex, 16)
-                    recovery_id = v_int - 27  # Convert v (27/28) to recovery_id (0/1)
-                    
-                    # Create signature using eth_keys (expects recovery_id 0/1, not v 27/28)
-                    signature = keys.Signature(vrs=(recovery_id, r, s))
-                    
-                    # Recover public key from hash and signature
-                    public_key = signature.recover_public_key_from_msg_hash(hash_bytes)
-                    
-                    # Get address from public key
-                    recovered_address = public_key.to_checksum_address()
+                    recovered_address = recover_address(signatures[v_int], hash_bytes)
                     
                     print(f"    v={v_int} (0x{v_int:02x}): {recovered_address}")
                     
-                    if recovered_address.lower() == expected_address.lower():
+                    if recovered_address.lower() == expected_lower:
                         print(f"    ✅ MATCH! Signature signs {name}")
                         return name, v_int, recovered_address
                         
@@ -96,19 +113,10 @@ def main():
     safe_tx_hash_bytes = bytes.fromhex(safe_tx_hash)
     
     # Hash candidates based on expert's analysis
-    hash_candidates = {
-        "Raw safeTxHash": safe_tx_hash_bytes,
-        "SHA256(safeTxHash)": hashlib.sha256(safe_tx_hash_bytes).digest(),
-        "SHA256(SHA256(safeTxHash))": hashlib.sha256(hashlib.sha256(safe_tx_hash_bytes).digest()).digest(),
-        "Keccak256(safeTxHash)": keccak(safe_tx_hash_bytes),
-    }
-    
-    # Add Ethereum personal sign format
-    personal_sign_message = b"\x19Ethereum Signed Message:\n32" + safe_tx_hash_bytes
-    hash_candidates["Personal Sign Format"] = keccak(personal_sign_message)
+    hash_candidates = build_hash_candidates(safe_tx_hash_bytes)
     
     print("Hash Candidates:")
-    for name, hash_bytes in hash_candidates.items():
+    for name, hash_bytes in hash_candidates:
         print(f"  {name}: {hash_bytes.hex()}")
     print()
     
@@ -170,4 +178,10 @@ def main():
         print("Phase 1: No match found")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Collect the report in memory and emit it with a single write
+    out = io.StringIO()
+    try:
+        with redirect_stdout(out):
+            main()
+    finally:
+        sys.stdout.write(out.getvalue())